@@ -1,20 +1,63 @@
 import sys
 import os
+import numpy as np
 from PIL import Image
-import pyperclip
-import re
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit, 
     QPushButton, QFileDialog, QProgressBar, QScrollArea, QGroupBox, QRadioButton,
-    QButtonGroup, QSpinBox, QMessageBox, QTextEdit, QFrame, QColorDialog,
+    QButtonGroup, QSpinBox, QMessageBox, QPlainTextEdit, QFrame, QColorDialog,
     QDialog, QDialogButtonBox, QCheckBox, QSlider
 )
+from PyQt5 import sip
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QColor, QPalette, QFont, QPixmap, QPainter, QImage, QIcon
+from PyQt5.QtGui import QColor, QPalette, QFont, QPixmap, QPixmapCache, QPainter, QImage, QIcon
+
+# 十六进制查找表：HEX2为2位（0-255），HEX1为1位（0-15），生成颜色标签时直接查表
+HEX2 = [f'{i:02x}' for i in range(256)]
+HEX1 = [f'{i:x}' for i in range(16)]
+
+COLOR_END = '</color>'  # 颜色闭合标签
+# 常见长度的颜色块内容预先生成，输出颜色块时直接按长度查表（更长的块再临时生成）
+RUN_TABLE_SIZE = 256
+BLOCK_RUNS = tuple('█' * i for i in range(RUN_TABLE_SIZE))
+
+class SegmentStore:
+    """处理结果：全部段落拼接为一个字符串按偏移切取，其余每段信息按列存为数组"""
+    def __init__(self, segments, line_nums, seg_in_line, line_end_indices, pixel_counts):
+        n = len(segments)
+        self.char_counts = np.fromiter(map(len, segments), np.int32, n)  # 每段字符数
+        self.offsets = np.zeros(n + 1, np.int64)  # 第i段为 text[offsets[i]:offsets[i+1]]
+        np.cumsum(self.char_counts, out=self.offsets[1:])
+        self.text = ''.join(segments)
+        self.line_nums = np.array(line_nums, np.int32)  # 所在行号
+        self.seg_in_line = np.array(seg_in_line, np.int32)  # 行内分段序号
+        self.is_line_end = np.zeros(n, np.bool_)  # 是否为行尾段
+        self.is_line_end[line_end_indices] = True
+        # 每段像素数（█与全角空格的个数，由分段时统计，无需再扫描文本）
+        self.pixel_counts = np.array(pixel_counts, np.int32)
+    
+    def __len__(self):
+        return len(self.char_counts)
+    
+    def __getitem__(self, i):
+        """取第i段富文本"""
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+    
+    def segments(self, start, end):
+        """取第start到end-1段富文本（偏移一次性转为列表后切取）"""
+        text = self.text
+        offsets = self.offsets[start:end + 1].tolist()
+        return [text[a:b] for a, b in zip(offsets, offsets[1:])]
+    
+    def label(self, i):
+        """第i段的分段标签（如"第1行第1段"）"""
+        return f"第{self.line_nums[i]}行第{self.seg_in_line[i]}段"
 
 class ImageProcessorThread(QThread):
     progress_updated = pyqtSignal(int)
-    processing_finished = pyqtSignal(list, list, list, int, QImage, int, int, int, int, list)
+    processing_finished = pyqtSignal(object, int, int, int, int, int)
     error_occurred = pyqtSignal(str)
     
     def __init__(self, image_path, target_width, target_height, transparent_option, custom_color, 
@@ -42,37 +85,46 @@ class ImageProcessorThread(QThread):
         self.font_start = f'<size={self.font_size}>' if self.font_size > 0 else ''
         self.font_end = '</size>' if self.font_size > 0 else ''
         self.font_tag_len = len(self.font_start) + len(self.font_end)
+        # 自定义背景色标签在整个任务中不变，只计算一次
+        self.custom_tag = self.get_custom_color_tag()
         
         self.has_alpha = False
+        self.is_trans = None  # 低于阈值的透明像素掩码（仅带透明通道的图片）
         self.total_pixels = 0
         self.current_x = 0
         self.current_y = 0
         self.total_processed_pixels = 0
         
+        self.segment_parts = []  # 分段片段缓冲区（各段复用）
+        # 分段规则在任务开始时即确定，直接绑定对应的分段方法
+        # （字符分段：严格控制字符长度，确保不丢像素）
+        # （按像素分段且不合并相近颜色时，段边界固定，整行颜色块可预先生成）
+        self.prebuilt_runs = self.segment_rule == 0 and not self.merge_similar
+        if self.prebuilt_runs:
+            self.process_segment = self.process_pixel_segment_prebuilt
+        elif self.segment_rule == 0:
+            self.process_segment = self.process_pixel_segment
+        else:
+            self.process_segment = self.process_char_segment_line_safe
+        
         # 记录每行的分段序号
         self.line_segment_counter = {}  # key: 行号, value: 当前分段序号
 
     def run(self):
         try:
-            # 图片读取与处理
-            img = Image.open(self.image_path)
-            if img.format.lower() in ['jpg', 'jpeg'] or img.mode != 'RGBA':
-                img = img.convert('RGB')
-                self.has_alpha = False
-            else:
-                img = img.convert('RGBA')
-                self.has_alpha = True
-            
-            orig_w, orig_h = img.size
-            if self.target_w > 0 and self.target_h > 0:
-                img = img.resize((self.target_w, self.target_h), Image.LANCZOS)
-            self.img_w, self.img_h = img.size
-            self.pixels = img.load()
+            # 图片读取与处理（解码、缩放、取像素均在此一次完成）
+            orig_w, orig_h = self.load_pixels()
             self.total_pixels = self.img_w * self.img_h
+            # 全角空格替代时，按每像素空格数预先生成常见长度的空格串
+            if self.trans_opt == 2:
+                self.space_runs = tuple('　' * (i * self.space_count) for i in range(RUN_TABLE_SIZE))
+            # 按去重后的颜色批量生成颜色标签，避免逐像素格式化
+            self.build_color_tags()
+            self.build_runs()
             
-            # 初始化预览图
-            self.preview = QImage(self.img_w, self.img_h, QImage.Format_ARGB32)
-            self.preview.fill(Qt.transparent)
+            # 预览图取色位置（仅相近颜色合并时需要）：默认取像素自身，分段过程中改为颜色块块首像素
+            if self.merge_similar:
+                self.anchor_x = np.tile(np.arange(self.img_w, dtype=np.int32), (self.img_h, 1))
             
             final_segments = []
             line_end_markers = []
@@ -81,7 +133,11 @@ class ImageProcessorThread(QThread):
             self.current_y = 0
             self.total_processed_pixels = 0
             self.line_segment_counter = {}  # 重置分段计数器
-            segment_labels = []  # 存储每个分段的标签（如"第1行第1段"）
+            segment_indices = []  # 每个分段的行内序号（标签"第X行第Y段"显示时再生成）
+            segment_pixel_counts = []  # 每个分段的像素数
+            # 全角空格替代的像素每个显示为space_count个空格，按显示的空格数统计
+            extra_space_chars = self.space_count - 1
+            last_progress = -1  # 上次发送的进度，进度变化时才发送信号
             
             # 循环处理所有像素（逐行处理，确保行完整性）
             while self.current_y < self.img_h:
@@ -89,22 +145,20 @@ class ImageProcessorThread(QThread):
                 # 初始化当前行的分段计数器
                 if current_line not in self.line_segment_counter:
                     self.line_segment_counter[current_line] = 0
+                # 取出当前行的预处理结果，分段时按颜色块读取
+                self.prepare_row(self.current_y)
                 # 按行处理，确保当前行所有像素都被处理
                 while self.current_x < self.img_w:
                     self.line_segment_counter[current_line] += 1  # 分段序号自增
                     current_segment_idx = self.line_segment_counter[current_line]
-                    segment_label = f"第{current_line}行第{current_segment_idx}段"  # 生成标签
                     
-                    if self.segment_rule == 0:
-                        segment, is_line_end, pixel_count_in_seg = self.process_pixel_segment()
-                    else:
-                        # 字符分段：严格控制字符长度，确保不丢像素
-                        segment, is_line_end, pixel_count_in_seg = self.process_char_segment_line_safe()
+                    segment, is_line_end, pixel_count_in_seg, space_pixel_count = self.process_segment()
                     
                     if segment:
                         final_segments.append(segment)
                         segment_line_mapping.append(current_line)
-                        segment_labels.append(segment_label)  # 保存标签
+                        segment_indices.append(current_segment_idx)
+                        segment_pixel_counts.append(pixel_count_in_seg + extra_space_chars * space_pixel_count)
                         self.total_processed_pixels += pixel_count_in_seg
                     
                     # 字符分段的is_line_end仅表示当前段是否超字符限制，不代表行结束
@@ -118,355 +172,387 @@ class ImageProcessorThread(QThread):
                 self.current_x = 0
                 self.current_y += 1
                 
-                # 更新进度
-                processed = self.current_y * self.img_w + self.current_x
-                progress = int((processed / self.total_pixels) * 100)
-                self.progress_updated.emit(progress)
+                # 更新进度（行首时current_x恒为0，按已处理行数计算，整数运算）
+                progress = self.current_y * 100 // self.img_h
+                if progress != last_progress:
+                    self.progress_updated.emit(progress)
+                    last_progress = progress
+            
+            # 分段完毕，释放仅分段时使用的中间数据（像素数组与取色位置保留，供按需生成预览图）
+            self.tag_ids = self.run_ends = self.char_prefix = self.run_starts = None
+            self.row_tag_ids = self.row_run_ends = self.row_char_prefix = self.row_pixels = None
+            self.row_run_starts = self.row_runs = self.row_space_prefix = None
+            
+            # 结果与每段统计信息在处理线程中整理好，界面线程直接取用
+            store = SegmentStore(final_segments, segment_line_mapping, segment_indices, line_end_markers, segment_pixel_counts)
             
             self.progress_updated.emit(100)
             self.processing_finished.emit(
-                final_segments, line_end_markers, segment_line_mapping, self.total_processed_pixels,
-                self.preview, self.img_w, self.img_h, orig_w, orig_h, segment_labels  # 传递标签列表
+                store, self.total_processed_pixels,
+                self.img_w, self.img_h, orig_w, orig_h
             )
             
         except Exception as e:
             self.error_occurred.emit(f"处理失败：{str(e)}")
     
-    def are_colors_similar(self, color1, color2):
-        """判断两个颜色是否相似"""
-        if not self.merge_similar:
-            return False
-            
-        # 计算RGB三个通道的差异
-        r_diff = abs(color1[0] - color2[0])
-        g_diff = abs(color1[1] - color2[1])
-        b_diff = abs(color1[2] - color2[2])
-        
-        # 计算总差异
-        total_diff = r_diff + g_diff + b_diff
-        
-        # 如果有透明度通道，也考虑透明度差异
-        if len(color1) == 4 and len(color2) == 4:
-            a_diff = abs(color1[3] - color2[3])
-            total_diff += a_diff
-            
-        return total_diff <= self.similarity_threshold
-    
-    def get_simplified_color(self, r, g, b):
-        """将颜色简化为RGB格式"""
-        if self.minimal_color:
-            # 与富文本一致：取每个通道的高4位
-            r_simple = (r // 16) * 16  # 例如：255 → 240 (0xF0), 123 → 112 (0x70)
-            g_simple = (g // 16) * 16
-            b_simple = (b // 16) * 16
-            return (r_simple, g_simple, b_simple)
-        return (r, g, b)
-    
-    def get_original_color_tag(self, r, g, b, a=None):
-        """生成原始颜色标签"""
-        # 确保a是整数
-        a_val = a if a is not None else 255
-        # 判断是否为透明像素（基于半透明阈值）
-        is_transparent = self.has_alpha and a_val < self.alpha_threshold
-        
-        # 透明字符替代模式下，小于阈值的像素强制使用#0000
-        if self.trans_opt == 1 and is_transparent:
-            return '<color=#0000>'
-        
-        # 判断是否完全不透明（有A通道且A=255）
-        is_fully_opaque = a_val == 255
-        # 判断是否完全透明（A=0）
-        is_fully_transparent = self.has_alpha and a_val == 0
-        
-        # 1. 完全透明像素（A=0）：无论开关状态，始终保留AA通道
-        # 2. 半透明像素（0 < A < 255）：根据开关状态决定是否保留AA通道
-        if is_fully_transparent:
-            # 完全透明像素：保留AA通道
-            if self.minimal_color:
-                return f'<color=#{(r//16):01x}{(g//16):01x}{(b//16):01x}0>'  # #RGBA格式（A=0）
-            else:
-                return f'<color=#{r:02x}{g:02x}{b:02x}00>'  # #RRGGBBAA格式（A=00）
-        elif 0 < a_val < 255:
-            # 半透明像素：根据开关状态处理
-            if self.keep_above_alpha:
-                # 开关开启：保留AA通道
-                if self.minimal_color:
-                    return f'<color=#{(r//16):01x}{(g//16):01x}{(b//16):01x}{(a_val//16):01x}>'
-                else:
-                    return f'<color=#{r:02x}{g:02x}{b:02x}{a_val:02x}>'
+    def load_pixels(self):
+        """读取并缩放图片，一次性解码为像素数组（H, W, 通道数），返回原图尺寸"""
+        with Image.open(self.image_path) as img:
+            if img.format.lower() in ['jpg', 'jpeg'] or img.mode != 'RGBA':
+                img = img.convert('RGB')
+                self.has_alpha = False
             else:
-                # 开关关闭：丢弃AA通道（强制不透明）
-                if self.minimal_color:
-                    return f'<color=#{(r//16):01x}{(g//16):01x}{(b//16):01x}>'
-                else:
-                    return f'<color=#{r:02x}{g:02x}{b:02x}>'
+                img = img.convert('RGBA')
+                self.has_alpha = True
+        
+        orig_w, orig_h = img.size
+        if self.target_w > 0 and self.target_h > 0:
+            # 大幅缩小时先用整数倍盒式缩小（Image.reduce）预处理，再做LANCZOS，减少LANCZOS的输入像素
+            img = img.resize((self.target_w, self.target_h), Image.LANCZOS, reducing_gap=3.0)
+        self.img_w, self.img_h = img.size
+        # 整块取出像素数据（Pillow在C层完成拷贝），之后不再逐像素访问Image对象
+        # 无透明通道的图片补齐为A=255的RGBA，后续处理统一按4通道读取，无需再区分通道数
+        rgba = img if self.has_alpha else img.convert('RGBA')
+        self.arr = np.frombuffer(rgba.tobytes(), dtype=np.uint8).reshape(self.img_h, self.img_w, 4)
+        return orig_w, orig_h
+
+    def build_color_tags(self):
+        """预计算整张图的颜色标签：先用数组运算把像素归并为标签键，每种标签只格式化一次"""
+        # 按通道拆成连续的平面（SoA）再做数组运算，避免在交错的RGBA数据上跨步访问
+        arr = self.arr
+        r, g, b = (arr[..., i].astype(np.int64) for i in range(3))
+        a = arr[..., 3]
+        # 极简色彩取每个通道的高4位（1位十六进制），否则2位
+        hex_table, shift = (HEX1, 4) if self.minimal_color else (HEX2, 0)
+        
+        # AA通道部分（256表示不带AA通道，强制不透明）：
+        # 1. 完全透明像素（A=0）：无论开关状态，始终保留AA通道（#RGB0 / #RRGGBB00）
+        # 2. 半透明像素（0 < A < 255）：开关开启时保留AA通道
+        keys = ((r >> shift) << 25) | ((g >> shift) << 17) | ((b >> shift) << 9)
+        if not self.has_alpha:
+            # 无透明通道的图片全部不透明：AA部分恒为256，跳过所有透明度相关的数组运算
+            keys |= 256
         else:
-            # 完全不透明像素：正常处理
-            if self.minimal_color:
-                return f'<color=#{(r//16):01x}{(g//16):01x}{(b//16):01x}>'
-            else:
-                return f'<color=#{r:02x}{g:02x}{b:02x}>'
+            alpha_code = np.full(a.shape, 256, np.int64)
+            if self.keep_above_alpha:
+                semi = (a > 0) & (a < 255)
+                alpha_code[semi] = a[semi] >> shift
+            alpha_code[a == 0] = 0
+            keys |= alpha_code
+            # 低于阈值的透明像素按透明处理方案使用特殊键：
+            # -1 全角空格替代（无颜色标签），-2 保持透明（强制#0000），-3 自定义背景色
+            # 透明掩码保留下来，生成预览图时直接复用
+            self.is_trans = a < self.alpha_threshold
+            keys[self.is_trans] = (-3, -2, -1)[self.trans_opt]
+        special_tags = {-1: None, -2: '<color=#0000>', -3: self.custom_tag}
+        
+        unique_keys, inverse = np.unique(keys.ravel(), return_inverse=True)
+        # 不同键可能得到相同标签（如自定义背景色与某像素颜色相同），按标签再次去重并编号
+        tag_index = {}
+        key_tag_ids = [
+            tag_index.setdefault(
+                special_tags[k] if k < 0 else
+                '<color=#' + hex_table[k >> 25] + hex_table[(k >> 17) & 0xFF] + hex_table[(k >> 9) & 0xFF]
+                + ('>' if (k & 0x1FF) == 256 else hex_table[k & 0x1FF] + '>'),
+                len(tag_index)
+            )
+            for k in unique_keys.tolist()
+        ]
+        self.tag_table = list(tag_index)  # 标签编号 -> 标签（None表示全角空格）
+        self.space_tag_id = tag_index.get(None, -1)
+        # 各标签作为块首像素时的字符长度：颜色标签 + 内容 + 闭合标签（空格替代时按空格数计算）
+        self.tag_first_chars = [
+            self.space_count if tag is None else len(tag) + 1 + len(COLOR_END)
+            for tag in self.tag_table
+        ]
+        self.tag_ids = np.array(key_tag_ids, dtype=np.int32)[inverse].reshape(self.img_h, self.img_w)
 
     def get_custom_color_tag(self):
-        """生成自定义背景色的颜色标签"""
-        if self.minimal_color:
+        """生成自定义背景色的颜色标签（每个任务只在初始化时调用一次）"""
+        if self.minimal_color and len(self.custom_color) == 7:  # #RRGGBB格式强制转为1位十六进制
             try:
-                if len(self.custom_color) == 7:  # #RRGGBB格式
-                    # 解析RR、GG、BB的十六进制值
-                    r_hex = self.custom_color[1:3]
-                    g_hex = self.custom_color[3:5]
-                    b_hex = self.custom_color[5:7]
-                    
-                    # 转换为十进制
-                    r = int(r_hex, 16)
-                    g = int(g_hex, 16)
-                    b = int(b_hex, 16)
-                    
-                    # 强制转为1位十六进制
-                    r_short = r // 16
-                    g_short = g // 16
-                    b_short = b // 16
-                    return f'<color=#{r_short:01x}{g_short:01x}{b_short:01x}>'
-                elif len(self.custom_color) == 4:  # 已经是#RGB格式
-                    return f'<color={self.custom_color}>'
-                else:
-                    # 其他格式保留原样
-                    return f'<color={self.custom_color}>'
-            except:
-                # 解析失败时使用原始颜色
-                return f'<color={self.custom_color}>'
-        
+                r, g, b = (int(self.custom_color[i:i + 2], 16) // 16 for i in (1, 3, 5))
+                return f'<color=#{r:01x}{g:01x}{b:01x}>'
+            except ValueError:
+                pass  # 解析失败时使用原始颜色
+        # #RGB及其他格式保留原样
         return f'<color={self.custom_color}>'
 
+    def build_runs(self):
+        """整图一次性游程编码：每个像素所在同色块的结束位置，以及每行的字符数前缀和"""
+        ids = self.tag_ids
+        cols = np.arange(1, self.img_w + 1)
+        
+        # 标签与右侧像素不同（或位于行尾）即为块尾，从右向左取最近块尾得到块结束位置
+        is_run_end = np.ones(ids.shape, dtype=bool)
+        is_run_end[:, :-1] = ids[:, 1:] != ids[:, :-1]
+        run_end_pos = np.where(is_run_end, cols, self.img_w)
+        self.run_ends = np.minimum.accumulate(run_end_pos[:, ::-1], axis=1)[:, ::-1]
+        
+        # 按像素分段且不合并相近颜色时，颜色块起点为标签变化处及每段起点（每行从0开始，每pixel_limit个像素一段）
+        if self.prebuilt_runs:
+            self.run_starts = np.ones(ids.shape, dtype=bool)
+            self.run_starts[:, 1:] = is_run_end[:, :-1]
+            self.run_starts[:, ::self.pixel_limit] = True
+        
+        # 块内每个像素的字符数（全角空格替代的像素按空格数计算），前缀和便于字符分段按上限截断
+        if self.segment_rule == 1:
+            pixel_chars = np.where(ids == self.space_tag_id, self.space_count, 1)
+            self.char_prefix = np.zeros((self.img_h, self.img_w + 1), dtype=np.int64)
+            np.cumsum(pixel_chars, axis=1, out=self.char_prefix[:, 1:])
+
+    def prepare_row(self, y):
+        """取出一行的标签编号、块结束位置等数据（转为列表便于逐块读取），只取当前模式用到的部分"""
+        # 段边界固定时，一次生成整行各颜色块的富文本，分段时按块拼接
+        if self.prebuilt_runs:
+            starts = np.flatnonzero(self.run_starts[y])
+            counts = np.diff(starts, append=self.img_w)
+            tag_table = self.tag_table
+            format_run = self.format_run
+            run_tag_ids = self.tag_ids[y][starts].tolist()
+            counts = counts.tolist()
+            self.row_run_starts = starts.tolist()
+            self.row_runs = [format_run(tag_table[tag_id], count) for tag_id, count in zip(run_tag_ids, counts)]
+            self.row_run_index = 0
+            # 全角空格替代时，按颜色块累计空格像素数，分段时相减即得本段的空格像素数
+            space_id = self.space_tag_id
+            self.row_space_prefix = [0, *accumulate(
+                count if tag_id == space_id else 0 for tag_id, count in zip(run_tag_ids, counts)
+            )] if space_id >= 0 else None
+            return
+        
+        # 比较颜色时只比较整数标签编号，输出颜色块时才查表取标签字符串
+        self.row_tag_ids = self.tag_ids[y].tolist()
+        self.row_run_ends = self.run_ends[y].tolist()
+        # 像素值仅用于相近颜色比较
+        if self.merge_similar:
+            self.row_pixels = self.arr[y].tolist()
+        # 字符数前缀和仅用于字符分段
+        if self.segment_rule == 1:
+            self.row_char_prefix = self.char_prefix[y].tolist()
+
+    def find_run_end(self, start, limit):
+        """查找从start开始的颜色块结束位置（不超过limit），相近颜色合并时以块首像素为基准"""
+        tag_id = self.row_tag_ids[start]
+        if not self.merge_similar or tag_id == self.space_tag_id:
+            return min(self.row_run_ends[start], limit)
+        
+        tag_ids = self.row_tag_ids
+        run_ends = self.row_run_ends
+        pixels = self.row_pixels
+        threshold = self.similarity_threshold
+        ar, ag, ab, aa = pixels[start]
+        # 与块首标签相同的像素整块跳过；其余像素与块首比较RGBA差异之和，超过阈值即结束
+        end = run_ends[start]
+        while end < limit:
+            if tag_ids[end] == tag_id:
+                end = run_ends[end]
+                continue
+            r, g, b, a = pixels[end]
+            if abs(r - ar) + abs(g - ag) + abs(b - ab) + abs(a - aa) > threshold:
+                break
+            end += 1
+        return min(end, limit)
+
+    def format_run(self, color_tag, count):
+        """生成一个颜色块的富文本（空格替代时为全角空格）"""
+        if color_tag is None:
+            return self.space_runs[count] if count < RUN_TABLE_SIZE else '　' * (count * self.space_count)
+        return f'{color_tag}{BLOCK_RUNS[count] if count < RUN_TABLE_SIZE else "█" * count}{COLOR_END}'
+
+    def mark_run_anchor(self, start, end):
+        """相近颜色合并时，记录颜色块内像素在预览图中使用的块首像素位置"""
+        if self.merge_similar and end - start > 1 and self.row_tag_ids[start] != self.space_tag_id:
+            self.anchor_x[self.current_y, start + 1:end] = start
+
     def process_char_segment_line_safe(self):
         """字符分段处理"""
-        segment_parts = [self.font_start]
+        # 循环中用到的属性先取为局部变量
+        tag_ids = self.row_tag_ids
+        tag_table = self.tag_table
+        tag_first_chars = self.tag_first_chars
+        prefix = self.row_char_prefix
+        char_limit = self.char_limit
+        img_w = self.img_w
+        find_run_end = self.find_run_end
+        format_run = self.format_run
+        mark_run_anchor = self.mark_run_anchor
+        
+        # 复用同一个片段列表，避免每段重新分配
+        segment_parts = self.segment_parts
+        segment_parts.clear()
+        segment_parts.append(self.font_start)
+        append = segment_parts.append
         current_char_count = self.font_tag_len
-        current_color_tag = None
-        current_color_pixel_count = 0
-        current_color_rgba = None  # 存储当前颜色的RGBA值用于相似度比较
-        pixel_count_in_seg = 0
-        is_line_end = False
-        
-        # 处理当前位置开始的像素，直到：1）超字符限制；2）行结束
-        while self.current_x < self.img_w:
-            # 获取当前像素
-            if self.has_alpha:
-                r, g, b, a = self.pixels[self.current_x, self.current_y]
-                current_rgba = (r, g, b, a)
-            else:
-                r, g, b = self.pixels[self.current_x, self.current_y]
-                a = 255
-                current_rgba = (r, g, b)
-            
-            # 判断是否为透明像素（基于半透明阈值）
-            is_transparent = self.has_alpha and a < self.alpha_threshold
-            
-            # 处理透明像素方案
-            if is_transparent:
-                if self.trans_opt == 2:  # 全角空格替代
-                    color_tag = None  # 空格不需要颜色标签
-                elif self.trans_opt == 1:  # 保持透明（根据极简模式选择格式）
-                    color_tag = self.get_original_color_tag(r, g, b, a)
-                else:  # 自定义背景色
-                    color_tag = self.get_custom_color_tag()
-            else:
-                # 非透明像素：调用统一颜色标签生成方法
-                color_tag = self.get_original_color_tag(r, g, b, a)
-            
-            # 计算添加当前像素后的字符长度
-            if color_tag == current_color_tag or (
-                current_color_tag is not None and 
-                self.are_colors_similar(current_color_rgba, current_rgba)
-            ):
-                # 同色或相似色：空格替代时按空格数计算字符长度，否则按█计算
-                if is_transparent and self.trans_opt == 2:
-                    add_char_count = self.space_count
-                else:
-                    add_char_count = 1
-                new_char_count = current_char_count + add_char_count
-            else:
-                # 不同色：计算颜色标签+内容的总长度
-                if is_transparent and self.trans_opt == 2:
-                    # 空格不需要颜色标签，直接加空格数
-                    add_char_count = self.space_count
-                    new_char_count = current_char_count + add_char_count
-                else:
-                    # 普通颜色标签：标签长度 + 内容长度 + 闭合标签长度
-                    add_char_count = len(color_tag) + 1 + len('</color>') if color_tag else 1
-                    new_char_count = current_char_count + add_char_count
+        space_pixels = 0  # 本段中全角空格替代的像素数
+        start_x = x = self.current_x
+        
+        # 逐个颜色块处理，直到：1）超字符限制；2）行结束
+        while x < img_w:
+            tag_id = tag_ids[x]
+            color_tag = tag_table[tag_id]
+            first_char_count = tag_first_chars[tag_id]
             
             # 若超字符限制，停止当前段（当前像素不加入，留到下一段）
-            if new_char_count > self.char_limit:
+            if current_char_count + first_char_count > char_limit:
                 # 若当前段为空（第一个像素就超限制），强制加入（避免空段）
-                if pixel_count_in_seg == 0:
-                    if is_transparent and self.trans_opt == 2:
-                        segment_parts.append('　' * self.space_count)
-                    else:
-                        segment_parts.append(f"{color_tag}█</color>" if color_tag else '█')
+                if x == start_x:
+                    segment_parts.append(format_run(color_tag, 1))
+                    if color_tag is None:
+                        space_pixels = 1
                     segment_parts.append(self.font_end)
-                    pixel_count_in_seg = 1
-                    self.update_preview(self.current_x, self.current_y, r, g, b, a, current_color_rgba)
-                    self.current_x += 1
+                    x += 1
                 break
             
-            # 同色或相似色合并处理
-            if color_tag == current_color_tag or (
-                current_color_tag is not None and 
-                self.are_colors_similar(current_color_rgba, current_rgba)
-            ):
-                current_color_pixel_count += 1
-            else:
-                # 先添加之前的颜色块或空格
-                if current_color_tag is not None:
-                    segment_parts.append(f"{current_color_tag}{'█' * current_color_pixel_count}</color>")
-                elif current_color_tag is None and self.trans_opt == 2 and pixel_count_in_seg > 0:
-                    segment_parts.append('　' * (current_color_pixel_count * self.space_count))
-                
-                current_color_tag = color_tag
-                current_color_rgba = current_rgba if color_tag else None
-                current_color_pixel_count = 1
+            # 块内其余像素每个至少占1个字符，据此限定查找范围，再按字符数前缀和截断
+            remaining = char_limit - current_char_count - first_char_count
+            run_end = find_run_end(x, min(img_w, x + 1 + remaining))
+            run_end = bisect_right(prefix, prefix[x + 1] + remaining, x + 1, run_end + 1) - 1
             
-            # 更新状态
-            current_char_count = new_char_count
-            pixel_count_in_seg += 1
-            self.update_preview(self.current_x, self.current_y, r, g, b, a, current_color_rgba)
-            self.current_x += 1
-        
-        # 添加最后一个颜色块或空格
-        if current_color_tag is not None:
-            segment_parts.append(f"{current_color_tag}{'█' * current_color_pixel_count}</color>")
-        elif current_color_tag is None and self.trans_opt == 2 and pixel_count_in_seg > 0:
-            segment_parts.append('　' * (current_color_pixel_count * self.space_count))
+            # 颜色块的标签、内容、闭合标签分别加入片段列表，最后统一拼接
+            count = run_end - x
+            if color_tag is None:
+                append(format_run(None, count))
+                space_pixels += count
+            else:
+                append(color_tag)
+                append(BLOCK_RUNS[count] if count < RUN_TABLE_SIZE else '█' * count)
+                append(COLOR_END)
+            mark_run_anchor(x, run_end)
+            current_char_count += first_char_count + prefix[run_end] - prefix[x + 1]
+            x = run_end
         
         segment_parts.append(self.font_end)
+        self.current_x = x
         
         # 行结束判断
-        is_line_end = (self.current_x >= self.img_w)
+        is_line_end = (x >= img_w)
         
-        return ''.join(segment_parts), is_line_end, pixel_count_in_seg
+        return ''.join(segment_parts), is_line_end, x - start_x, space_pixels
 
     def process_pixel_segment(self):
         """按像素分段"""
-        segment_parts = [self.font_start]
-        current_pixel_count = 0
-        is_line_end = False
-        current_color_tag = None
-        color_pixel_count = 0
-        current_color_rgba = None  # 存储当前颜色的RGBA值用于相似度比较
-        
-        while self.current_y < self.img_h and current_pixel_count < self.pixel_limit:
-            if self.current_x >= self.img_w:
-                is_line_end = True
-                break
-            
-            # 获取像素
-            if self.has_alpha:
-                r, g, b, a = self.pixels[self.current_x, self.current_y]
-                current_rgba = (r, g, b, a)
-            else:
-                r, g, b = self.pixels[self.current_x, self.current_y]
-                a = 255
-                current_rgba = (r, g, b)
-            
-            # 判断是否为透明像素（基于半透明阈值）
-            is_transparent = self.has_alpha and a < self.alpha_threshold
-            
-            # 处理透明像素方案
-            if is_transparent:
-                if self.trans_opt == 2:  # 全角空格替代
-                    color_tag = None  # 空格不需要颜色标签
-                elif self.trans_opt == 1:  # 保持透明（根据极简模式选择格式）
-                    color_tag = self.get_original_color_tag(r, g, b, a)
-                else:  # 自定义背景色
-                    color_tag = self.get_custom_color_tag()
+        tag_ids = self.row_tag_ids
+        tag_table = self.tag_table
+        find_run_end = self.find_run_end
+        format_run = self.format_run
+        mark_run_anchor = self.mark_run_anchor
+        
+        # 复用同一个片段列表，避免每段重新分配
+        segment_parts = self.segment_parts
+        segment_parts.clear()
+        segment_parts.append(self.font_start)
+        append = segment_parts.append
+        space_pixels = 0  # 本段中全角空格替代的像素数
+        start_x = x = self.current_x
+        segment_end = min(start_x + self.pixel_limit, self.img_w)
+        
+        # 逐个颜色块处理，颜色块不跨越分段
+        while x < segment_end:
+            run_end = find_run_end(x, segment_end)
+            color_tag = tag_table[tag_ids[x]]
+            count = run_end - x
+            if color_tag is None:
+                append(format_run(None, count))
+                space_pixels += count
             else:
-                # 非透明像素：调用统一颜色标签生成方法
-                color_tag = self.get_original_color_tag(r, g, b, a)
-            
-            # 判断是否为相同颜色或相似颜色
-            if color_tag == current_color_tag or (
-                current_color_tag is not None and 
-                self.are_colors_similar(current_color_rgba, current_rgba)
-            ):
-                color_pixel_count += 1
-            else:
-                # 先添加之前的颜色块或空格
-                if current_color_tag is not None:
-                    segment_parts.append(f"{current_color_tag}{'█' * color_pixel_count}</color>")
-                elif current_color_tag is None and self.trans_opt == 2 and color_pixel_count > 0:
-                    segment_parts.append('　' * (color_pixel_count * self.space_count))
-                
-                current_color_tag = color_tag
-                current_color_rgba = current_rgba if color_tag else None
-                color_pixel_count = 1
-            
+                append(color_tag)
+                append(BLOCK_RUNS[count] if count < RUN_TABLE_SIZE else '█' * count)
+                append(COLOR_END)
             # 更新预览图（应用相近颜色合并和极简色彩）
-            self.update_preview(self.current_x, self.current_y, r, g, b, a, current_color_rgba)
-            
-            self.current_x += 1
-            current_pixel_count += 1
-            
-            # 行尾判断
-            if self.current_x >= self.img_w:
-                is_line_end = True
-                break
-        
-        # 添加最后一个颜色块或空格
-        if current_color_tag is not None:
-            segment_parts.append(f"{current_color_tag}{'█' * color_pixel_count}</color>")
-        elif current_color_tag is None and self.trans_opt == 2 and color_pixel_count > 0:
-            segment_parts.append('　' * (color_pixel_count * self.space_count))
+            mark_run_anchor(x, run_end)
+            x = run_end
         
         segment_parts.append(self.font_end)
+        self.current_x = x
         
-        return ''.join(segment_parts), is_line_end, current_pixel_count
+        # 行尾判断
+        is_line_end = (x >= self.img_w)
+        
+        return ''.join(segment_parts), is_line_end, x - start_x, space_pixels
+    
+    def process_pixel_segment_prebuilt(self):
+        """按像素分段（颜色块已按段边界切分并预先生成，直接拼接本段的颜色块）"""
+        start_x = self.current_x
+        segment_end = min(start_x + self.pixel_limit, self.img_w)
+        first = self.row_run_index
+        last = bisect_left(self.row_run_starts, segment_end, first)
+        self.row_run_index = last
+        self.current_x = segment_end
+        
+        space_prefix = self.row_space_prefix
+        space_pixels = space_prefix[last] - space_prefix[first] if space_prefix else 0
+        
+        segment = self.font_start + ''.join(self.row_runs[first:last]) + self.font_end
+        return segment, segment_end >= self.img_w, segment_end - start_x, space_pixels
     
-    def update_preview(self, x, y, r, g, b, a=255, current_color_rgba=None):
-        """更新预览图像素"""
-        # 判断是否为透明像素（基于半透明阈值）
-        is_transparent = self.has_alpha and a < self.alpha_threshold
-        # 判断是否完全透明（A=0）
-        is_fully_transparent = self.has_alpha and a == 0
-        
-        # 完全透明像素（A=0）始终保持透明，不受开关影响
-        if is_fully_transparent:
-            self.preview.setPixelColor(x, y, QColor(r, g, b, 0))
+    def get_custom_preview_rgba(self):
+        """自定义背景色在预览图中的RGBA（极简色彩时取每个通道的高4位）"""
+        if self.minimal_color and len(self.custom_color) == 7:
+            try:
+                cr = int(self.custom_color[1:3], 16) // 16 * 16
+                cg = int(self.custom_color[3:5], 16) // 16 * 16
+                cb = int(self.custom_color[5:7], 16) // 16 * 16
+                return (cr, cg, cb, 255)
+            except ValueError:
+                pass
+        color = QColor(self.custom_color)
+        if not color.isValid():
+            return (0, 0, 0, 0)
+        return (color.red(), color.green(), color.blue(), color.alpha())
+
+    def build_preview(self):
+        """根据像素数据一次性生成预览图（ARGB32），在首次预览时由界面调用"""
+        arr = self.arr.astype(np.uint32)
+        r, g, b, a = arr[..., 0], arr[..., 1], arr[..., 2], arr[..., 3]
+        
+        # 取色像素：相近颜色合并时为所在颜色块的块首像素，否则为像素自身
+        if self.merge_similar:
+            src = arr[np.arange(self.img_h)[:, None], self.anchor_x]
+            sr, sg, sb, sa = src[..., 0], src[..., 1], src[..., 2], src[..., 3]
         else:
-            # 非完全透明像素：按原有逻辑处理
-            if not self.keep_above_alpha and self.has_alpha and a > self.alpha_threshold:
-                a = 255
-            
-            if is_transparent:
-                if self.trans_opt == 1:  # 透明字符替代：强制使用#0000对应的透明色
-                    self.preview.setPixelColor(x, y, QColor(0, 0, 0, 0))
-                elif self.trans_opt == 0:  # 自定义背景色（应用极简色彩，但保持纯色）
-                    if self.minimal_color and len(self.custom_color) == 7:
-                        try:
-                            cr = int(self.custom_color[1:3], 16) // 16 * 16
-                            cg = int(self.custom_color[3:5], 16) // 16 * 16
-                            cb = int(self.custom_color[5:7], 16) // 16 * 16
-                            self.preview.setPixelColor(x, y, QColor(cr, cg, cb, 255))
-                        except:
-                            self.preview.setPixelColor(x, y, QColor(self.custom_color))
-                    else:
-                        self.preview.setPixelColor(x, y, QColor(self.custom_color))
-                elif self.trans_opt == 2:  # 全角空格替代（透明块占位）
-                    self.preview.setPixelColor(x, y, QColor(0, 0, 0, 0))
+            sr, sg, sb, sa = r, g, b, a
+        # 丢弃半透明：高于阈值的半透明强制不透明
+        if not self.keep_above_alpha:
+            sa = np.where(sa > self.alpha_threshold, 255, sa)
+        # 极简色彩：保持纯色，取每个通道的高4位
+        if self.minimal_color:
+            sr, sg, sb = sr & 0xF0, sg & 0xF0, sb & 0xF0
+        preview = (sa << 24) | (sr << 16) | (sg << 8) | sb
+        
+        # 低于阈值的透明像素：自定义背景色，或透明占位（透明字符/全角空格替代）
+        # （无透明通道的图片没有透明掩码，不会命中以下两种情况）
+        if self.is_trans is not None:
+            if self.trans_opt == 0:
+                cr, cg, cb, ca = self.get_custom_preview_rgba()
+                trans_color = (ca << 24) | (cr << 16) | (cg << 8) | cb
             else:
-                # 确保每个像素是纯净的单色，无混合
-                if self.merge_similar and current_color_rgba is not None:
-                    # 相近颜色合并：使用当前颜色块的纯色
-                    sr, sg, sb = self.get_simplified_color(current_color_rgba[0], current_color_rgba[1], current_color_rgba[2])
-                    sa = current_color_rgba[3] if len(current_color_rgba) == 4 else 255
-                    # 应用半透明丢弃逻辑
-                    if not self.keep_above_alpha and self.has_alpha and sa > self.alpha_threshold:
-                        sa = 255
-                    self.preview.setPixelColor(x, y, QColor(sr, sg, sb, sa))
-                else:
-                    # 仅应用极简色彩，保持纯色
-                    sr, sg, sb = self.get_simplified_color(r, g, b)
-                    self.preview.setPixelColor(x, y, QColor(sr, sg, sb, a))
+                trans_color = 0
+            preview[self.is_trans] = trans_color
+            # 完全透明像素（A=0）始终保持透明，不受开关影响
+            fully_transparent = a == 0
+            preview[fully_transparent] = ((r << 16) | (g << 8) | b)[fully_transparent]
+        
+        # 直接在numpy缓冲区上构造QImage（不拷贝），copy()后交给界面线程，与缓冲区生命周期解耦
+        buf = np.ascontiguousarray(preview, dtype=np.uint32)
+        image = QImage(sip.voidptr(buf.ctypes.data), self.img_w, self.img_h, 4 * self.img_w, QImage.Format_ARGB32)
+        return image.copy()
+
+class PreviewScaleThread(QThread):
+    """在后台线程中缩放预览图（QImage可在非界面线程中处理）"""
+    scale_finished = pyqtSignal(int, QImage)  # 请求序号, 缩放后的图片
+    
+    def __init__(self, request_id, image, width, height):
+        super().__init__()
+        self.request_id = request_id
+        self.image = image
+        self.width = width
+        self.height = height
+    
+    def run(self):
+        # 使用FastTransformation保持像素锐利
+        scaled_img = self.image.scaled(self.width, self.height, Qt.KeepAspectRatio, Qt.FastTransformation)
+        self.scale_finished.emit(self.request_id, scaled_img)
 
 class PreviewDialog(QDialog):
     def __init__(self, preview_img, target_w, target_h, orig_w, orig_h, parent=None):
@@ -476,6 +562,8 @@ class PreviewDialog(QDialog):
         self.preview_img = preview_img  # 原始预览图
         self.target_w = target_w
         self.target_h = target_h
+        self.scale_request_id = 0  # 最新的缩放请求序号，旧请求的结果直接丢弃
+        self.scale_threads = []  # 正在运行的缩放线程
         
         layout = QVBoxLayout(self)
         info = QLabel(f"目标分辨率: {target_w}x{target_h} | 原图分辨率: {orig_w}x{orig_h}")
@@ -502,7 +590,12 @@ class PreviewDialog(QDialog):
         default_scale = min(800/target_w, 600/target_h, 8.0)
         self.scale_slider.setValue(int(default_scale))
         
-        self.scale_slider.valueChanged.connect(self.scale_preview)
+        # 连续调整缩放比例时合并为一次缩放（停止调整50ms后再开始）
+        self.scale_timer = QTimer(self)
+        self.scale_timer.setSingleShot(True)
+        self.scale_timer.setInterval(50)
+        self.scale_timer.timeout.connect(lambda: self.scale_preview(self.scale_slider.value()))
+        self.scale_slider.valueChanged.connect(self.scale_timer.start)
         scale_layout.addWidget(self.scale_slider)
         scale_layout.addStretch()
         layout.addLayout(scale_layout)
@@ -512,15 +605,17 @@ class PreviewDialog(QDialog):
         self.img_label.setAlignment(Qt.AlignCenter)
         self.scroll_layout.addWidget(self.img_label)
         
-        # 初始缩放
-        self.scale_preview(int(default_scale))
+        # 初始缩放（在界面线程中直接完成，打开时即显示；再次打开时直接取缓存）
+        sw, sh = int(target_w * int(default_scale)), int(target_h * int(default_scale))
+        if not self.show_cached_pixmap(sw, sh):
+            self.set_scaled_image(0, self.preview_img.scaled(sw, sh, Qt.KeepAspectRatio, Qt.FastTransformation))
         
         btn_box = QDialogButtonBox(QDialogButtonBox.Ok)
         btn_box.accepted.connect(self.accept)
         layout.addWidget(btn_box)
     
     def scale_preview(self, scale):
-        """缩放预览图"""
+        """缩放预览图（在后台线程中缩放，完成后再更新显示）"""
         if scale <= 0:
             return
         
@@ -528,15 +623,120 @@ class PreviewDialog(QDialog):
         sw = int(self.target_w * scale)
         sh = int(self.target_h * scale)
         
-        # 使用FastTransformation保持像素锐利
-        scaled_img = self.preview_img.scaled(
-            sw, sh, 
-            Qt.KeepAspectRatio, 
-            Qt.FastTransformation
-        )
-        
-        # 更新图片
-        self.img_label.setPixmap(QPixmap.fromImage(scaled_img))
+        self.scale_request_id += 1
+        # 缩放过的尺寸直接使用缓存的QPixmap
+        if self.show_cached_pixmap(sw, sh):
+            return
+        thread = PreviewScaleThread(self.scale_request_id, self.preview_img, sw, sh)
+        thread.scale_finished.connect(self.set_scaled_image)
+        thread.finished.connect(lambda: self.release_scale_thread(thread))
+        self.scale_threads.append(thread)
+        thread.start()
+    
+    def release_scale_thread(self, thread):
+        """缩放线程结束后释放"""
+        thread.wait()
+        if thread in self.scale_threads:
+            self.scale_threads.remove(thread)
+    
+    def pixmap_cache_key(self, width, height):
+        """缩放后预览图在QPixmapCache中的键（按原始预览图与缩放尺寸区分）"""
+        return f"preview_{self.preview_img.cacheKey()}_{width}x{height}"
+    
+    def show_cached_pixmap(self, width, height):
+        """缓存中有该尺寸的预览图时直接显示，返回是否命中"""
+        pixmap = QPixmapCache.find(self.pixmap_cache_key(width, height))
+        if pixmap is None:
+            return False
+        self.img_label.setPixmap(pixmap)
+        return True
+    
+    def set_scaled_image(self, request_id, scaled_img):
+        """更新图片（只显示最新一次请求的结果），转换后的QPixmap存入缓存"""
+        pixmap = QPixmap.fromImage(scaled_img)
+        QPixmapCache.insert(self.pixmap_cache_key(scaled_img.width(), scaled_img.height()), pixmap)
+        if request_id == self.scale_request_id:
+            self.img_label.setPixmap(pixmap)
+    
+    def done(self, result):
+        """关闭前等待缩放线程结束"""
+        self.scale_timer.stop()
+        for thread in self.scale_threads:
+            thread.wait()
+        super().done(result)
+
+class SegmentCard(QFrame):
+    """单段结果卡片（控件只创建一次，翻页时更新内容）"""
+    def __init__(self, on_copy, parent=None):
+        super().__init__(parent)
+        self.setObjectName("segmentFrame")
+        self.text = ""
+        self.content_loaded = False  # 内容是否已填入文本框（滚动到可见范围时才填充）
+        # 网格布局：第0行头部，第1行内容，第2行复制区域（第0列为弹性空白，右侧两列放已复制标签与复制按钮）
+        grid = QGridLayout(self)
+        grid.setColumnStretch(0, 1)
+        
+        # 头部（分段标签 + 行尾标记 + 统计信息）
+        # 行尾标记隐藏时不应留出间距，因此头部单独用一行水平布局
+        header_layout = QHBoxLayout()
+        # 分段标签（黄色粗体）
+        self.label_widget = QLabel()
+        self.label_widget.setObjectName("segmentLabel")
+        header_layout.addWidget(self.label_widget)
+        # 行尾标记（非行尾时隐藏）
+        self.end_marker = QLabel("【行尾】")
+        self.end_marker.setObjectName("lineEndMarker")
+        header_layout.addWidget(self.end_marker)
+        # 统计信息
+        self.pixel_label = QLabel()
+        self.pixel_label.setObjectName("pixelCountLabel")
+        header_layout.addWidget(self.pixel_label)
+        self.char_label = QLabel()
+        self.char_label.setObjectName("charCountLabel")
+        header_layout.addWidget(self.char_label)
+        header_layout.addStretch()
+        grid.addLayout(header_layout, 0, 0, 1, 3)
+        
+        # 内容
+        self.content_edit = QPlainTextEdit()
+        self.content_edit.setReadOnly(True)
+        self.content_edit.setMaximumHeight(100)
+        self.content_edit.document().setUndoRedoEnabled(False)  # 只读展示，无需撤销记录
+        grid.addWidget(self.content_edit, 1, 0, 1, 3)
+        
+        # 已复制标签（默认隐藏，绿色粗体，样式见全局样式表）
+        self.copied_label = QLabel("已复制")
+        self.copied_label.setObjectName("copiedLabel")
+        self.copied_label.setVisible(False)
+        grid.addWidget(self.copied_label, 2, 1)
+        
+        # 复制按钮（所有卡片共用同一槽函数，按按钮上记录的段索引复制）
+        self.copy_btn = QPushButton("复制")
+        self.copy_btn.setObjectName("copyBtn")
+        self.copy_btn.clicked.connect(on_copy)
+        grid.addWidget(self.copy_btn, 2, 2)
+    
+    def set_segment(self, index, segment, header, is_line_end):
+        """更新卡片显示的段落（header为分段标签、像素数、字符数文字）"""
+        # 段落变化时才清空文本框待重新填充（同一页重复显示时保留已填内容）
+        if segment != self.text:
+            self.text = segment
+            self.content_edit.clear()
+            self.content_loaded = False
+        self.copy_btn.setProperty("seg_index", index)
+        segment_label, pixel_text, char_text = header
+        self.label_widget.setText(segment_label)
+        self.end_marker.setVisible(is_line_end)
+        self.pixel_label.setText(pixel_text)
+        self.char_label.setText(char_text)
+        self.copied_label.setVisible(False)
+        self.setVisible(True)
+    
+    def load_content(self):
+        """将段落填入文本框"""
+        if not self.content_loaded:
+            self.content_edit.setPlainText(self.text)
+            self.content_loaded = True
 
 class ImageToRichTextApp(QMainWindow):
     def __init__(self):
@@ -549,11 +749,10 @@ class ImageToRichTextApp(QMainWindow):
         self.setWindowIcon(QIcon(os.path.join(sys._MEIPASS, "千星图标.png")) if hasattr(sys, '_MEIPASS') else QIcon("千星图标.png"))
         # 初始化变量
         self.custom_color = "#888888"
-        self.results = []
-        self.line_end_markers = []
-        self.segment_line_mapping = []
+        self.results = SegmentStore([], [], [], [], [])  # 处理结果（段落及每段信息）
         self.total_pixel_count = 0
         self.preview_img = None
+        self.preview_builder = None  # 生成预览图的方法（处理完成后由处理线程提供）
         self.current_page = 0
         self.total_pages = 0
         self.items_per_page = 5
@@ -562,6 +761,7 @@ class ImageToRichTextApp(QMainWindow):
         self.original_height = 0
         self.target_width = 40
         self.target_height = 30
+        self.resolution_sender = None  # 最近一次修改的分辨率输入框（延迟同步宽高比时使用）
         self.minimal_color = False  # 极简色彩开关
         self.merge_similar = False  # 相近颜色合并开关
         self.similarity_threshold = 10  # 颜色相似度阈值
@@ -569,7 +769,7 @@ class ImageToRichTextApp(QMainWindow):
         self.keep_above_alpha = True  # 保留高于阈值半透明（默认开启）
         self.space_replacement_enabled = False  # 是否启用全角空格替代
         self.space_count = 1  # 每个像素的全角空格数
-        self.segment_labels = []  # 存储分段标签
+        self.card_pool = []  # 结果卡片池（翻页时复用）
     
     def init_style(self):
         """深色主题样式"""
@@ -597,7 +797,7 @@ class ImageToRichTextApp(QMainWindow):
                 text-align: center; background-color: #3f3f46; height: 20px;
             }
             QProgressBar::chunk { background-color: #0078d4; width: 10px; }
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #1e1e1e; color: #d4d4d4;
                 border: 1px solid #3f3f46; border-radius: 4px; padding: 5px;
             }
@@ -614,6 +814,7 @@ class ImageToRichTextApp(QMainWindow):
             QLabel#lineEndMarker { color: #ff6b6b; font-weight: bold; font-size: 14px; }
             QLabel#pixelCountLabel { color: #00ff9d; font-style: italic; }
             QLabel#charCountLabel { color: #00c8ff; font-style: italic; }
+            QLabel#copiedLabel { color: #00ff9d; font-weight: bold; margin-right: 8px; }
             QLabel#segmentLabel { color: #ffff66; font-weight: bold; font-size: 14px; margin-right: 10px; }
             QSlider::groove:horizontal {
                 border: 1px solid #515151;
@@ -705,6 +906,11 @@ class ImageToRichTextApp(QMainWindow):
         target_layout.addWidget(self.target_height_spin)
         target_layout.addStretch()
         
+        # 连续调整分辨率时合并为一次宽高比同步（停止调整40ms后再同步）
+        self.resolution_timer = QTimer(self)
+        self.resolution_timer.setSingleShot(True)
+        self.resolution_timer.setInterval(40)
+        self.resolution_timer.timeout.connect(self.apply_resolution_change)
         self.target_width_spin.valueChanged.connect(self.on_resolution_changed)
         self.target_height_spin.valueChanged.connect(self.on_resolution_changed)
         
@@ -907,7 +1113,11 @@ class ImageToRichTextApp(QMainWindow):
         self.scroll_layout = QVBoxLayout(self.scroll_content)
         self.scroll_layout.setContentsMargins(10, 10, 10, 10)
         self.scroll_layout.setSpacing(10)
+        self.scroll_layout.addStretch()
         self.scroll_area.setWidget(self.scroll_content)
+        # 滚动或可视区域变化时补充填充新露出的卡片
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.load_visible_cards)
+        self.scroll_area.verticalScrollBar().rangeChanged.connect(self.load_visible_cards)
         result_layout.addWidget(self.scroll_area)
         
         # 分页导航
@@ -998,8 +1208,11 @@ class ImageToRichTextApp(QMainWindow):
             self.total_segments_display_label.setText(f"共 {self.total_segments} 段，")
             # 页码范围限制在1-总页数（最多三位数）
             max_page = min(self.total_pages, 999)
+            # 只同步显示，不触发跳页（缩小范围时页码被截断会发出valueChanged）
+            self.page_spin.blockSignals(True)
             self.page_spin.setRange(1, max_page)
             self.page_spin.setValue(self.current_page + 1)  # 转换为1-based
+            self.page_spin.blockSignals(False)
             self.total_pages_label.setText(f"页，共 {self.total_pages} 页")
             self.prev_btn.setEnabled(self.current_page > 0)
             self.next_btn.setEnabled(self.current_page < self.total_pages - 1)
@@ -1024,11 +1237,16 @@ class ImageToRichTextApp(QMainWindow):
         self.similarity_value_label.setText(f"{value}")  # 实时更新显示数值
     
     def on_resolution_changed(self, value):
+        """分辨率变化（记录修改的输入框，延迟同步宽高比）"""
+        self.resolution_sender = self.sender()
+        self.resolution_timer.start()
+    
+    def apply_resolution_change(self):
         """保持宽高比"""
         if not self.keep_aspect_checkbox.isChecked() or self.original_width == 0 or self.original_height == 0:
             return
         
-        sender = self.sender()
+        sender = self.resolution_sender
         if sender == self.target_width_spin:
             new_width = self.target_width_spin.value()
             new_height = int(new_width * self.original_height / self.original_width)
@@ -1083,6 +1301,11 @@ class ImageToRichTextApp(QMainWindow):
             QMessageBox.warning(self, "警告", "请先选择有效的图片文件")
             return
         
+        # 分辨率还有未同步的修改时先同步
+        if self.resolution_timer.isActive():
+            self.resolution_timer.stop()
+            self.apply_resolution_change()
+        
         # 获取透明处理选项
         transparent_option = self.transparent_bg.checkedId()
         # 获取分段规则（1=按字符分段，0=按像素分段）
@@ -1120,19 +1343,18 @@ class ImageToRichTextApp(QMainWindow):
         self.progress_bar.setValue(value)
         self.progress_bar.setFormat(f"处理中: {value}%")
     
-    def on_finish(self, segments, line_end_markers, segment_line_mapping, total_pixel_count, preview_image, width, height, original_width, original_height, segment_labels):
+    def on_finish(self, store, total_pixel_count, width, height, original_width, original_height):
         """处理完成"""
-        self.results = segments
-        self.line_end_markers = line_end_markers
-        self.segment_line_mapping = segment_line_mapping
+        self.results = store
         self.total_pixel_count = total_pixel_count
-        self.preview_img = preview_image
+        # 预览图按需生成：用户点击“预览结果”时才由处理线程的像素数据构造
+        self.preview_img = None
+        self.preview_builder = self.thread.build_preview
         self.target_width = width
         self.target_height = height
         self.original_width = original_width
         self.original_height = original_height
-        self.segment_labels = segment_labels  # 保存分段标签
-        self.total_segments = len(segments)  # 更新总段数
+        self.total_segments = len(store)  # 更新总段数
         
         # 分页计算
         self.total_pages = (len(self.results) + self.items_per_page - 1) // self.items_per_page
@@ -1152,98 +1374,81 @@ class ImageToRichTextApp(QMainWindow):
     
     def display_page(self, page_number):
         """显示当前页结果"""
-        self.clear_results()
         if not self.results:
+            self.clear_results()
             return
         
         start_idx = page_number * self.items_per_page
         end_idx = min(start_idx + self.items_per_page, len(self.results))
         
-        for i in range(start_idx, end_idx):
-            segment = self.results[i]
-            is_line_end = i in self.line_end_markers
-            segment_label = self.segment_labels[i] if i < len(self.segment_labels) else f"第{self.segment_line_mapping[i]}行第{i - start_idx + 1}段"
-            
-            # 统计信息（包含透明像素的█占位）
-            clean_text = re.sub(r'<[^>]+>', '', segment)
-            pixel_count = clean_text.count('█') + clean_text.count('　')  # 包含全角空格和透明占位的█
-            char_count = len(segment)
-            
-            # 段落容器
-            segment_frame = QFrame()
-            segment_frame.setObjectName("segmentFrame")
-            segment_layout = QVBoxLayout(segment_frame)
-            
-            # 头部（分段标签 + 行尾标记 + 统计信息）
-            header_layout = QHBoxLayout()
-            # 添加分段标签（黄色粗体）
-            label_widget = QLabel(segment_label)
-            label_widget.setObjectName("segmentLabel")
-            header_layout.addWidget(label_widget)
-            # 行尾标记
-            if is_line_end:
-                end_marker = QLabel("【行尾】")
-                end_marker.setObjectName("lineEndMarker")
-                header_layout.addWidget(end_marker)
-            # 统计信息
-            pixel_label = QLabel(f"像素数: {pixel_count}")
-            pixel_label.setObjectName("pixelCountLabel")
-            header_layout.addWidget(pixel_label)
-            char_label = QLabel(f"字符数: {char_count}")
-            char_label.setObjectName("charCountLabel")
-            header_layout.addWidget(char_label)
-            header_layout.addStretch()
-            segment_layout.addLayout(header_layout)
-            
-            # 内容
-            content_edit = QTextEdit()
-            content_edit.setPlainText(segment)
-            content_edit.setReadOnly(True)
-            content_edit.setMaximumHeight(100)
-            segment_layout.addWidget(content_edit)
-            
-            # 复制区域
-            copy_layout = QHBoxLayout()
-            copy_layout.addStretch()
-            
-            # 已复制标签（默认隐藏，绿色粗体）
-            copied_label = QLabel("已复制")
-            copied_label.setStyleSheet("color: #00ff9d; font-weight: bold; margin-right: 8px;")
-            copied_label.setVisible(False)
-            copy_layout.addWidget(copied_label)
-            
-            # 复制按钮
-            copy_btn = QPushButton("复制")
-            copy_btn.setObjectName("copyBtn")
-            # 绑定事件时传递标签
-            copy_btn.clicked.connect(lambda _, t=segment, lbl=copied_label: self.copy_segment(t, lbl))
-            copy_layout.addWidget(copy_btn)
-            
-            segment_layout.addLayout(copy_layout)
-            
-            self.scroll_layout.addWidget(segment_frame)
-        
-        self.scroll_layout.addStretch()
+        # 批量更新期间暂停重绘，全部卡片更新完后统一刷新一次
+        self.scroll_content.setUpdatesEnabled(False)
+        # 卡片池不足时补充，多余的卡片隐藏
+        count = end_idx - start_idx
+        while len(self.card_pool) < count:
+            card = SegmentCard(self.on_copy_clicked)
+            self.scroll_layout.insertWidget(len(self.card_pool), card)
+            self.card_pool.append(card)
+        
+        # 本页头部文字一次性生成（分段标签、像素数、字符数）
+        store = self.results
+        headers = zip(
+            [store.label(i) for i in range(start_idx, end_idx)],
+            [f"像素数: {n}" for n in store.pixel_counts[start_idx:end_idx].tolist()],
+            [f"字符数: {n}" for n in store.char_counts[start_idx:end_idx].tolist()]
+        )
+        # 本页段落与行尾标记按切片一次取出，与卡片并行迭代
+        for card, i, segment, header, is_line_end in zip(
+            self.card_pool, range(start_idx, end_idx), store.segments(start_idx, end_idx),
+            headers, store.is_line_end[start_idx:end_idx].tolist()
+        ):
+            card.set_segment(i, segment, header, is_line_end)
+        
+        for card in self.card_pool[count:]:
+            card.setVisible(False)
+        # 先完成布局，再只为可见范围内的卡片填充内容
+        # （新增或重新显示卡片后，滚动区域稍后才会调整内容区大小；先按布局所需高度调整，否则卡片被挤在旧高度内全部判为可见）
+        self.scroll_content.resize(
+            self.scroll_content.width(),
+            max(self.scroll_content.sizeHint().height(), self.scroll_area.viewport().height())
+        )
+        self.scroll_layout.activate()
+        self.load_visible_cards()
+        self.scroll_content.setUpdatesEnabled(True)
         # 更新分页导航状态
         self.update_page_navigation()
     
+    def load_visible_cards(self):
+        """为滚动区域可见范围内的卡片填充内容（滚动时按需补充）"""
+        top = self.scroll_area.verticalScrollBar().value()
+        bottom = top + self.scroll_area.viewport().height()
+        for card in self.card_pool:
+            if card.isVisibleTo(self.scroll_content) and not card.content_loaded and card.y() < bottom and card.y() + card.height() > top:
+                card.load_content()
+    
     def clear_results(self):
-        """清空结果区域"""
-        while self.scroll_layout.count() > 0:
-            item = self.scroll_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+        """清空结果区域（隐藏卡片，保留以便复用）"""
+        for card in self.card_pool:
+            card.setVisible(False)
+    
+    def on_copy_clicked(self):
+        """复制按钮点击：按按钮记录的段索引取段落"""
+        btn = self.sender()
+        self.copy_segment(self.results[btn.property("seg_index")], btn.parentWidget().copied_label)
     
     def copy_segment(self, text, copied_label):
         """复制段落（显示常驻已复制标签）"""
-        pyperclip.copy(text)
+        QApplication.clipboard().setText(text)
         copied_label.setVisible(True)
     
     def show_preview(self):
         """显示预览图"""
-        if not self.preview_img:
+        if self.preview_builder is None:
             QMessageBox.warning(self, "警告", "请先生成处理结果")
             return
+        # 首次预览时才生成预览图，之后复用
+        if self.preview_img is None:
+            self.preview_img = self.preview_builder()
         
         preview_dialog = PreviewDialog(
             self.preview_img, self.target_width, self.target_height,
@@ -1275,10 +1480,10 @@ if __name__ == "__main__":
     
     # 全局调色板
     palette = QPalette()
-    palette.setColor(QPalette.Window, QColor("#2d2d30"))
+    palette.setColor(QPalette.Window, QColor(45, 45, 48))
     palette.setColor(QPalette.WindowText, QColor(224, 224, 224))
-    palette.setColor(QPalette.Base, QColor("#1e1e1e"))
-    palette.setColor(QPalette.AlternateBase, QColor("#2d2d30"))
+    palette.setColor(QPalette.Base, QColor(30, 30, 30))
+    palette.setColor(QPalette.AlternateBase, QColor(45, 45, 48))
     palette.setColor(QPalette.Text, QColor(224, 224, 224))
     palette.setColor(QPalette.Button, QColor(63, 63, 70))
     palette.setColor(QPalette.ButtonText, Qt.white)